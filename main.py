@@ -1,176 +1,442 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 
+# Install uvloop as the event loop policy before anything touches asyncio;
+# it is the compiled loop that gives uvicorn/FastAPI most of its throughput.
+# Optional so local development on platforms without uvloop still works.
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+import asyncio
+import functools
 import httpx
+import orjson
 import os
 import base64
 import logging
-import phonenumbers
-from phonenumbers import geocoder
-
-# Initialize the FastAPI application
-app = FastAPI()
-
-processed_call_ids = set()
-
-# Configure basic logging to output informational messages for debugging and monitoring
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-# Define a set of US states that require two-party consent for recording.
-# Recording calls in these states without the consent of all parties involved can be illegal.
-TWO_PARTY_STATES = {
-    "CALIFORNIA", "CONNECTICUT", "DELAWARE", "FLORIDA", "ILLINOIS", "MARYLAND",
-    "MASSACHUSETTS", "MICHIGAN", "MONTANA", "NEW HAMPSHIRE", "OREGON", "PENNSYLVANIA", "WASHINGTON"
-}
-
-# Define a dictionary mapping US area codes to their corresponding states.
-# This is used as a fallback mechanism to determine the caller's state.
-# Note: This list might not be exhaustive or completely accurate due to area code splits and portability.
-AREA_CODE_TO_STATE = {
-    # California (CA)
-    "213": "CA", "310": "CA", "415": "CA", "408": "CA", "818": "CA", "619": "CA", "510": "CA",
-    # Connecticut (CT)
-    "203": "CT", "860": "CT",
-    # Delaware (DE)
-    "302": "DE",
-    # Florida (FL)
-    "305": "FL", "407": "FL", "561": "FL", "813": "FL", "904": "FL",
-    # Illinois (IL)
-    "312": "IL", "773": "IL", "847": "IL",
-    # Maryland (MD)
-    "301": "MD", "410": "MD", "443": "MD",
-    # Massachusetts (MA)
-    "617": "MA", "781": "MA", "508": "MA",
-    # Michigan (MI)
-    "313": "MI", "248": "MI", "734": "MI",
-    # Montana (MT)
-    "406": "MT",
-    # New Hampshire (NH)
-    "603": "NH",
-    # Oregon (OR)
-    "503": "OR", "541": "OR", "971": "OR",
-    # Pennsylvania (PA)
-    "215": "PA", "412": "PA", "717": "PA", "610": "PA",
-    # Washington (WA)
-    "206": "WA", "253": "WA", "425": "WA",
-    # 1-party states (examples)
-    "212": "NY", "646": "NY", "718": "NY",
-    "214": "TX", "512": "TX", "713": "TX",
-    "703": "VA", "804": "VA"
-}
+import queue
+import socket
+import time
+import redis.asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from pydantic import BaseModel
+
+from states import (NPA_CONSENT, NPA_STATE_ARRAY, NPA_TO_STATE, STATE_ACTION,
+                    STATE_NAME_TO_ABBR, _US_STATE_ABBRS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for the process: keep-alive (and HTTP/2 multiplexing)
+    # means webhooks reuse an open connection to api.aircall.io instead of
+    # paying a fresh TCP + TLS handshake on every call. The auth header is
+    # installed on the client so the request path passes no header dict at all.
+    # TCP_NODELAY keeps Nagle's algorithm from sitting on the small pause
+    # POSTs; paired with keep-alive the option persists across calls.
+    app.state.http = httpx.AsyncClient(
+        base_url=AIRCALL_API_BASE_URL,
+        headers=_HEADERS if _AUTH_HEADER else None,
+        timeout=5.0,
+        transport=httpx.AsyncHTTPTransport(
+            retries=0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+            socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+        ),
+    )
+    # Pause requests are queued here and drained by background workers, so the
+    # webhook acks Aircall immediately instead of holding the connection open
+    # for the upstream round-trip.
+    app.state.pause_queue = asyncio.Queue(maxsize=10_000)
+    app.state.pause_workers = [
+        asyncio.create_task(_pause_worker(app)) for _ in range(_PAUSE_WORKERS)
+    ]
+    app.state.redis = redis.asyncio.Redis.from_url(REDIS_URL) if REDIS_URL else None
+    yield
+    for task in app.state.pause_workers:
+        task.cancel()
+    await asyncio.gather(*app.state.pause_workers, return_exceptions=True)
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
+    await app.state.http.aclose()
+
+# Initialize the FastAPI application. orjson handles response encoding; it is
+# a compiled JSON implementation several times faster than the stdlib module.
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Compress larger responses at the cheapest gzip level; the usual terminal
+# bodies are tiny and skip it via minimum_size. TLS termination and HTTP/2
+# toward Aircall belong on the reverse proxy in front of this service.
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=1)
+
+# Deduplication cache: call ID -> expiry timestamp. Aircall redelivers the
+# same event within seconds, so a short TTL catches duplicates while the
+# size cap keeps memory bounded over weeks of traffic (the old plain set
+# grew forever). Insertion-ordered so the oldest entries evict first.
+_DEDUP_TTL_SECONDS = 300
+_DEDUP_MAX_ENTRIES = 10_000
+processed_call_ids: OrderedDict = OrderedDict()
+
+def _already_processed(call_id) -> bool:
+    """
+    Returns True if this call ID was seen within the dedup TTL; otherwise
+    records it (evicting the oldest entries past the size cap) and returns False.
+    """
+    now = time.time()
+    expiry = processed_call_ids.get(call_id)
+    if expiry is not None and expiry > now:
+        return True
+    processed_call_ids[call_id] = now + _DEDUP_TTL_SECONDS
+    processed_call_ids.move_to_end(call_id)
+    while len(processed_call_ids) > _DEDUP_MAX_ENTRIES:
+        processed_call_ids.popitem(last=False)
+    return False
+
+class _OrjsonFormatter(logging.Formatter):
+    """Serializes log records to single-line JSON via orjson."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(payload).decode()
+
+def _configure_logging() -> QueueListener:
+    """
+    Routes all records through an in-memory queue drained by a background
+    thread, so request coroutines never block on stderr writes under load.
+    Log calls use %-style arguments so formatting is deferred to the listener
+    and skipped entirely when the level is filtered out.
+    """
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(_OrjsonFormatter())
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+_log_listener = _configure_logging()
+logger = logging.getLogger(__name__)
+
+# Pre-bound lookup methods for the paths the NPA arrays don't cover (the
+# geocoder fallback and its consent decision).
+_npa_state = NPA_TO_STATE.get
+_state_action = STATE_ACTION.get
 
 # Retrieve Aircall API credentials and URL from environment variables.
 # These should be configured in your Render deployment for security.
 AIRCALL_API_ID = os.getenv("AIRCALL_API_ID")
 AIRCALL_API_TOKEN = os.getenv("AIRCALL_API_TOKEN")
-AIRCALL_API_URL = "https://api.aircall.io/v1/calls"
+AIRCALL_API_BASE_URL = "https://api.aircall.io"
+
+# Optional Redis URL. When set, webhook deduplication uses a shared SET NX key
+# so duplicates are caught across uvicorn workers and restarts; when unset,
+# the in-process TTL cache above is used.
+REDIS_URL = os.getenv("REDIS_URL")
+
+# The credentials never change at runtime, so build the Basic-Auth header once
+# at import instead of re-encoding it on every webhook.
+_AUTH_HEADER = (
+    "Basic " + base64.b64encode(f"{AIRCALL_API_ID}:{AIRCALL_API_TOKEN}".encode("ascii")).decode("ascii")
+    if AIRCALL_API_ID and AIRCALL_API_TOKEN
+    else None
+)
+_HEADERS = {"Authorization": _AUTH_HEADER, "Content-Type": "application/json"}
+
+_MEDIA_JSON = "application/json"
+
+# Response bodies are tiny and mostly constant, so encode them once at import;
+# the terminal paths hand Starlette pre-built bytes instead of re-serializing
+# the same payload per request. The per-state variants cover every state the
+# consent table knows about (plus the unknown-state case for the paused body).
+_B_DUPLICATE = orjson.dumps({"status": "duplicate_skipped"})
+_B_NON_US = orjson.dumps({"status": "non_us_number"})
+_B_CREDENTIALS_MISSING = orjson.dumps({"status": "credentials_missing"})
+_B_IGNORED = orjson.dumps({"status": "ignored_event"})
+_B_INTERNAL_ERROR = orjson.dumps({"error": "internal_error"})
+_B_PAUSED = {s: orjson.dumps({"recording": "paused", "state": s}) for s in STATE_ACTION}
+_B_PAUSED[None] = orjson.dumps({"recording": "paused", "state": None})
+_B_ACTIVE = {s: orjson.dumps({"recording": "active", "state": s}) for s in STATE_ACTION}
+
+# How many pause requests a single worker batch may gather into one
+# asyncio.gather, how many workers drain the queue concurrently, and how long
+# a worker lingers for more arrivals before flushing a non-full batch.
+_PAUSE_BATCH_SIZE = 64
+_PAUSE_WORKERS = 4
+_PAUSE_BATCH_WINDOW = 0.005
+
+@app.exception_handler(Exception)
+async def _unhandled_exception(request: Request, exc: Exception):
+    # Anything the narrowed handlers below don't expect lands here: one log
+    # record with the traceback, one constant 500 body. Keeping the hot path
+    # free of broad try/except blocks means the error-free case pays nothing.
+    logger.error("Unhandled error processing %s", request.url.path, exc_info=exc)
+    return Response(content=_B_INTERNAL_ERROR, media_type=_MEDIA_JSON, status_code=500)
+
+async def _pause_worker(app: FastAPI) -> None:
+    """
+    Background worker: takes call IDs off the pause queue, coalescing a burst
+    into one batch, and issues the Aircall pause requests concurrently.
+    """
+    pause_queue = app.state.pause_queue
+    while True:
+        call_ids = [await pause_queue.get()]
+        # Linger briefly so a burst arriving within the window rides the same
+        # batch (and the same HTTP/2 connection) instead of one POST per tick.
+        while len(call_ids) < _PAUSE_BATCH_SIZE:
+            try:
+                call_ids.append(await asyncio.wait_for(pause_queue.get(), timeout=_PAUSE_BATCH_WINDOW))
+            except asyncio.TimeoutError:
+                break
+        results = await asyncio.gather(
+            *(_pause_recording(app.state.http, cid) for cid in call_ids),
+            return_exceptions=True,
+        )
+        for call_id, result in zip(call_ids, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to pause recording for call ID %s: %s", call_id, result)
+        for _ in call_ids:
+            pause_queue.task_done()
+
+def _abbr_for_description(description: str) -> str or None:
+    """
+    Converts a geocoder description like "California" or "San Antonio, TX" to a
+    USPS state abbreviation, or returns None for non-US descriptions.
+    """
+    description = description.strip().upper()
+    abbr = STATE_NAME_TO_ABBR.get(description)
+    if abbr:
+        return abbr
+    if "," in description:
+        tail = description.rsplit(",", 1)[1].strip()
+        if tail in _US_STATE_ABBRS:
+            return tail
+        return STATE_NAME_TO_ABBR.get(tail)
+    return None
+
+# Strips the separators Aircall-adjacent systems put in formatted numbers
+# ("+1 (303) 555-1234", "+1-303.555.1234") in a single pass and allocation,
+# so common formatting variants stay on the fast path instead of falling
+# through to the full phonenumbers parse.
+_STRIP_TABLE = str.maketrans("", "", " -.()")
+
+@functools.lru_cache(maxsize=131072)
+def _state_for_prefix(prefix: str) -> str or None:
+    """
+    Resolves a "+1NPA" prefix (e.g. "+1303") to a USPS state abbreviation.
+    The state is a pure function of the prefix, so results are memoized: repeat
+    callers (and any caller sharing an area code) cost one cache lookup instead
+    of re-running the lookup or the phonenumbers fallback.
+    """
+    npa = prefix[2:5]
+    state = NPA_STATE_ARRAY[int(npa)] if npa.isdecimal() else None
+    if state:
+        return state
+    # Unknown NPA: geocode a representative number for this prefix, since the
+    # geocoder's data is itself keyed by prefix.
+    return _geocode_state(prefix + "5550100")
+
+# Sentinel: the in-loop fast path could not resolve the state and the
+# phonenumbers pipeline is needed.
+_UNRESOLVED = object()
+
+def _classify_in_loop(phone_number: str):
+    """
+    The cheap part of call classification that is safe to run on the event
+    loop. Returns (state, keep_recording) resolved from the per-NPA arrays --
+    keep_recording True for 1-party, False for 2-party -- or _UNRESOLVED when
+    only the phonenumbers pipeline can answer.
+    """
+    if not phone_number:
+        return (None, None)
+    phone_number = phone_number.strip()
+    if not (phone_number[:2] == "+1" and len(phone_number) >= 5 and phone_number[2:5].isdecimal()):
+        phone_number = phone_number.translate(_STRIP_TABLE)
+        if not (phone_number[:2] == "+1" and len(phone_number) == 12 and phone_number[2:].isdecimal()):
+            return _UNRESOLVED
+    npa = int(phone_number[2:5])
+    consent = NPA_CONSENT[npa]
+    if consent == 0:
+        return _UNRESOLVED
+    return (NPA_STATE_ARRAY[npa], consent == 1)
 
 def get_us_state_from_phone_number(phone_number: str) -> str or None:
     """
-    Attempts to determine the US state from a phone number using the `phonenumbers` library.
-    It first tries to parse the number and get the state from the geolocation data.
-    If that fails or doesn't provide a specific state, it falls back to the `AREA_CODE_TO_STATE` mapping.
+    Attempts to determine the US state (USPS abbreviation) from a phone number.
+    For canonical E.164 "+1NXXNXXXXXX" input the state is a pure function of the
+    3-digit NPA, so the hot path is a single memoized prefix lookup. The full
+    `phonenumbers` parse + geocoder pipeline is kept only as a cold fallback for
+    non-canonical input.
     """
     if not phone_number:
         return None
+    # Normalize so "+1 303..." and "+1303..." share a cache slot.
+    phone_number = phone_number.strip()
+    # Fast path: "+1" followed by the 3 NPA digits.
+    if phone_number[:2] == "+1" and len(phone_number) >= 5 and phone_number[2:5].isdigit():
+        return _state_for_prefix(phone_number[:5])
+    # Formatted variants: strip separators in one translate pass and reuse the
+    # cached prefix lookup rather than running the full parser.
+    cleaned = phone_number.translate(_STRIP_TABLE)
+    if cleaned[:2] == "+1" and len(cleaned) == 12 and cleaned[2:].isdigit():
+        return _state_for_prefix(cleaned[:5])
+    return _geocode_state(phone_number)
+
+# phonenumbers pulls in multi-megabyte data tables at import; loaded lazily on
+# the first cold-path geocode so workers whose traffic the NPA arrays fully
+# cover never pay the import cost or the RAM (which multiplies under
+# uvicorn --workers).
+phonenumbers = None
+geocoder = None
+
+def _load_phonenumbers() -> None:
+    global phonenumbers, geocoder
+    if phonenumbers is None:
+        import phonenumbers as _phonenumbers
+        from phonenumbers import geocoder as _geocoder
+        phonenumbers = _phonenumbers
+        geocoder = _geocoder
+
+def _geocode_state(phone_number: str) -> str or None:
+    """
+    Cold path: runs the full `phonenumbers` parse + geocoder pipeline on a
+    phone number and maps the result to a USPS state abbreviation.
+    """
+    _load_phonenumbers()
     try:
-        # Parse the phone number assuming it's a US number
+        # Parse the phone number assuming it's a US number. No is_valid_number
+        # check: it is the dominant cost of this path (description_for_number
+        # would re-run it internally, hence description_for_valid_number), and
+        # an unknown prefix simply resolves to no state, which downstream
+        # already handles.
         parsed_number = phonenumbers.parse(phone_number, "US")
-        if not phonenumbers.is_valid_number(parsed_number):
-            logging.warning(f"Invalid US phone number: {phone_number}")
-            return None
         # Get the geographical description for the number (this might include the state)
-        state_province = geocoder.description_for_number(parsed_number, "en")
+        state_province = geocoder.description_for_valid_number(parsed_number, "en")
         if state_province:
-            # Extract the state abbreviation (assuming the last word is the state) and convert to uppercase
-            return state_province.split()[-1].upper()
+            return _abbr_for_description(state_province)
         else:
             # Fallback: Extract the area code and look up the state in our mapping
-            area_code = str(phonenumbers.national_number(parsed_number))[:3]
-            return AREA_CODE_TO_STATE.get(area_code)
+            area_code = str(parsed_number.national_number)[:3]
+            return _npa_state(area_code)
     except phonenumbers.NumberParseException:
-        logging.warning(f"Could not parse phone number: {phone_number}")
-        return None
-    except Exception as e:
-        logging.error(f"An error occurred during phone number parsing: {e}")
+        logger.warning("Could not parse phone number: %s", phone_number)
         return None
 
+async def _pause_recording(client: httpx.AsyncClient, call_id) -> httpx.Response:
+    """
+    Asks the Aircall API to pause recording on a call, using the pooled client
+    (auth headers are already installed on it). Returns the API response.
+    """
+    response = await client.post(f"/v1/calls/{call_id}/pause_recording")
+    logger.info("Aircall API response for pausing recording on call ID %s: Status=%s, Body=%s", call_id, response.status_code, response.text)
+    return response
+
+# Typed shape of the Aircall webhook payload. FastAPI hands the raw body to
+# pydantic-core, which parses bytes straight into these attributes -- one
+# compiled pass instead of a dict-of-dicts traversal with .get chains. Extra
+# fields in the payload are ignored as usual.
+class AircallNumber(BaseModel):
+    id: int | None = None
+    name: str | None = None
+
+class AircallCallData(BaseModel):
+    id: int | None = None
+    raw_digits: str | None = None
+    number: AircallNumber = AircallNumber()
+    participants: list[dict] = []
+
+class AircallWebhook(BaseModel):
+    event: str | None = None
+    data: AircallCallData = AircallCallData()
+
 # Define the webhook endpoint that will handle incoming POST requests from Aircall
 @app.post("/webhook")
-async def handle_webhook(request: Request):
-    payload = await request.json()
-    event = payload.get("event")
-    logging.info(f"Received Aircall webhook event: {event}")
+async def handle_webhook(request: Request, payload: AircallWebhook):
+    event = payload.event
+    logger.info("Received Aircall webhook event: %s", event)
 
     if event == "call.answered":
-        call_data = payload.get("data", {})
-
-        number_info = call_data.get("number", {})
-        number_id = number_info.get("id")
-        number_name = number_info.get("name")
-        logging.info(f"📟 Aircall number info: ID={number_id}, Name={number_name}")
-
-        call_id = call_data.get("id")
-        
-        # Deduplication: skip if we've already processed this call ID
-        if call_id in processed_call_ids:
-            logging.info(f"🔁 Duplicate webhook received for call ID {call_id}. Skipping.")
-            return JSONResponse(content={"status": "duplicate_skipped"}, status_code=200)
-        # Mark this call ID as processed
-        processed_call_ids.add(call_id)
-        
-        phone_number = call_data.get("raw_digits")
+        call_data = payload.data
+        call_id = call_data.id
 
-        if not phone_number:
-            for p in call_data.get("participants", []):
-                if p.get("type") == "external" and "phone_number" in p:
-                    phone_number = p["phone_number"]
-                    break
+        # Deduplication: one SET NX round-trip when Redis is configured (shared
+        # across workers and restarts), otherwise the in-process TTL cache.
+        # A Redis outage degrades to the local cache rather than failing the
+        # webhook -- worst case is a duplicate pause request, which is benign.
+        redis_client = request.app.state.redis
+        if redis_client is not None:
+            try:
+                duplicate = not await redis_client.set(
+                    f"aircall:call:{call_id}", "1", nx=True, ex=_DEDUP_TTL_SECONDS
+                )
+            except redis.RedisError as e:
+                logger.warning("Redis dedup unavailable, using local cache: %s", e)
+                duplicate = _already_processed(call_id)
+        else:
+            duplicate = _already_processed(call_id)
+        if duplicate:
+            logger.info("Duplicate webhook received for call ID %s. Skipping.", call_id)
+            return Response(content=_B_DUPLICATE, media_type=_MEDIA_JSON)
+
+        phone_number = call_data.raw_digits
 
-        logging.info(f"📞 Incoming call from {phone_number} with ID {call_id}")
+        if not phone_number:
+            # First external participant with a phone number; next() stops at
+            # the first hit.
+            phone_number = next(
+                (p["phone_number"] for p in call_data.participants
+                 if p.get("type") == "external" and "phone_number" in p),
+                None,
+            )
 
+        # Cheap reject before anything else: non-US calls skip the logging and
+        # state resolution below entirely.
         if not phone_number or not phone_number.startswith("+1"):
-            logging.info(f"📞 Non-US phone number detected: {phone_number}. Skipping state-based recording logic.")
-            return JSONResponse(content={"status": "non_us_number"}, status_code=200)
-
-        state = get_us_state_from_phone_number(phone_number)
-
-        if state in TWO_PARTY_STATES or state is None:
-            consent_type = "2-party" if state in TWO_PARTY_STATES else "unknown"
-            logging.info(f"🔒 {consent_type} consent state detected (or state not identified). Attempting to pause recording for call ID: {call_id}.")
-            if AIRCALL_API_ID and AIRCALL_API_TOKEN and call_id:
-                credentials = f"{AIRCALL_API_ID}:{AIRCALL_API_TOKEN}"
-                encoded_credentials = base64.b64encode(credentials.encode()).decode()
-                headers = {
-                    "Authorization": f"Basic {encoded_credentials}",
-                    "Content-Type": "application/json"
-                }
-                pause_recording_url = f"{AIRCALL_API_URL}/{call_id}/pause_recording"
-                async with httpx.AsyncClient() as client:
-                    try:
-                        response = await client.post(pause_recording_url, headers=headers)
-                        logging.info(f"⏸️ Aircall API response for pausing recording on call ID {call_id}: Status={response.status_code}, Body={response.text}")
-
-                        if response.status_code == 204:
-                            logging.info(f"✅ Successfully paused recording for call ID {call_id} (204 No Content)")
-                            return Response(status_code=204)  # Empty body
-                        else:
-                            return JSONResponse(
-                                content={"recording": "paused", "state": state},
-                                status_code=response.status_code
-                            )
-
-                    except httpx.HTTPError as e:
-                        logging.error(f"🚨 HTTP error while calling Aircall API to pause recording on call ID {call_id}: {e}")
-                        return JSONResponse(content={"error": str(e)}, status_code=500)
-                    except Exception as e:
-                        logging.error(f"🔥 An unexpected error occurred while pausing recording on call ID {call_id}: {e}")
-                        return JSONResponse(content={"error": str(e)}, status_code=500)
+            logger.info("Non-US phone number detected: %s. Skipping state-based recording logic.", phone_number)
+            return Response(content=_B_NON_US, media_type=_MEDIA_JSON)
+
+        number_info = call_data.number
+        logger.info("Aircall number info: ID=%s, Name=%s", number_info.id, number_info.name)
+        logger.info("Incoming call from %s with ID %s", phone_number, call_id)
+
+        classified = _classify_in_loop(phone_number)
+        if classified is _UNRESOLVED:
+            # The phonenumbers pipeline is a millisecond-scale CPU chunk that
+            # would stall every other coroutine; run it in a worker thread.
+            # NPA table hits never get here.
+            state = await asyncio.to_thread(get_us_state_from_phone_number, phone_number)
+            # True = 1-party (keep recording), False = 2-party, None = unknown.
+            keep_recording = _state_action(state)
+        else:
+            state, keep_recording = classified
+
+        if not keep_recording:
+            consent_type = "2-party" if keep_recording is False else "unknown"
+            logger.info("%s consent state detected (or state not identified). Attempting to pause recording for call ID: %s.", consent_type, call_id)
+            if _AUTH_HEADER and call_id:
+                # Hand the call off to the background workers and ack the
+                # webhook immediately; Aircall only cares about the status code.
+                await request.app.state.pause_queue.put(call_id)
+                body = _B_PAUSED.get(state) or orjson.dumps({"recording": "paused", "state": state})
+                return Response(content=body, media_type=_MEDIA_JSON)
             else:
-                logging.warning("Aircall API credentials or call ID not available to pause recording.")
-                return JSONResponse(content={"status": "credentials_missing"}, status_code=500)
+                logger.warning("Aircall API credentials or call ID not available to pause recording.")
+                return Response(content=_B_CREDENTIALS_MISSING, media_type=_MEDIA_JSON, status_code=500)
         else:
-            logging.info(f"✅ {state} is a 1-party consent state. Recording will continue as default for call ID: {call_id}.")
-            return JSONResponse(content={"recording": "active", "state": state}, status_code=200)
+            logger.info("%s is a 1-party consent state. Recording will continue as default for call ID: %s.", state, call_id)
+            return Response(content=_B_ACTIVE[state], media_type=_MEDIA_JSON)
     else:
-        return JSONResponse(content={"status": "ignored_event"}, status_code=200)
+        return Response(content=_B_IGNORED, media_type=_MEDIA_JSON)
@@ -0,0 +1,208 @@
+import sys
+
+# State lookup tables for the webhook's consent logic. Kept in their own
+# module so the large NPA literal is compiled once and simply imported by
+# main (including across uvicorn --reload cycles).
+
+# Define a set of US states that require two-party consent for recording.
+# Recording calls in these states without the consent of all parties involved can be illegal.
+# Keyed by USPS abbreviation to match the values in NPA_TO_STATE below.
+# frozenset: membership is read-only and CPython fast-paths frozen sets.
+TWO_PARTY_STATES = frozenset({
+    "CA", "CT", "DE", "FL", "IL", "MD",
+    "MA", "MI", "MT", "NH", "OR", "PA", "WA"
+})
+
+# Exhaustive mapping of US NPAs (3-digit area codes) to USPS state abbreviations,
+# generated from libphonenumber's geocoding data. For a +1 number the state is a
+# pure function of the NPA, so a single dict lookup here replaces the full
+# phonenumbers parse + geocoder call on the hot webhook path. Canadian and
+# Caribbean +1 NPAs are deliberately absent: they are not US states, so they
+# fall through to the "unknown state" handling.
+NPA_TO_STATE = {
+    # Alabama (AL)
+    "205": "AL", "251": "AL", "256": "AL", "334": "AL", "659": "AL", "938": "AL",
+    # Alaska (AK)
+    "907": "AK",
+    # Arizona (AZ)
+    "480": "AZ", "520": "AZ", "602": "AZ", "623": "AZ", "928": "AZ",
+    # Arkansas (AR)
+    "327": "AR", "479": "AR", "501": "AR", "870": "AR",
+    # California (CA)
+    "209": "CA", "213": "CA", "279": "CA", "310": "CA", "323": "CA", "341": "CA", "350": "CA",
+    "369": "CA", "408": "CA", "415": "CA", "424": "CA", "442": "CA", "510": "CA", "530": "CA",
+    "559": "CA", "562": "CA", "619": "CA", "626": "CA", "628": "CA", "650": "CA", "657": "CA",
+    "661": "CA", "669": "CA", "707": "CA", "714": "CA", "738": "CA", "747": "CA", "760": "CA",
+    "805": "CA", "818": "CA", "820": "CA", "831": "CA", "840": "CA", "858": "CA", "909": "CA",
+    "916": "CA", "925": "CA", "949": "CA", "951": "CA",
+    # Colorado (CO)
+    "303": "CO", "719": "CO", "720": "CO", "748": "CO", "970": "CO", "983": "CO",
+    # Connecticut (CT)
+    "203": "CT", "475": "CT", "860": "CT", "959": "CT",
+    # Delaware (DE)
+    "302": "DE",
+    # District of Columbia (DC)
+    "202": "DC", "771": "DC",
+    # Florida (FL)
+    "239": "FL", "305": "FL", "321": "FL", "324": "FL", "352": "FL", "386": "FL", "407": "FL",
+    "448": "FL", "561": "FL", "645": "FL", "656": "FL", "689": "FL", "727": "FL", "728": "FL",
+    "754": "FL", "772": "FL", "786": "FL", "813": "FL", "850": "FL", "863": "FL", "904": "FL",
+    "941": "FL", "954": "FL",
+    # Georgia (GA)
+    "229": "GA", "404": "GA", "470": "GA", "478": "GA", "678": "GA", "706": "GA", "762": "GA",
+    "770": "GA", "912": "GA", "943": "GA",
+    # Guam (GU)
+    "671": "GU",
+    # Hawaii (HI)
+    "808": "HI",
+    # Idaho (ID)
+    "208": "ID", "986": "ID",
+    # Illinois (IL)
+    "217": "IL", "224": "IL", "309": "IL", "312": "IL", "331": "IL", "447": "IL", "464": "IL",
+    "618": "IL", "630": "IL", "708": "IL", "730": "IL", "773": "IL", "779": "IL", "815": "IL",
+    "847": "IL", "872": "IL",
+    # Indiana (IN)
+    "219": "IN", "260": "IN", "317": "IN", "463": "IN", "574": "IN", "765": "IN", "812": "IN",
+    "930": "IN",
+    # Iowa (IA)
+    "319": "IA", "515": "IA", "563": "IA", "641": "IA", "712": "IA",
+    # Kansas (KS)
+    "316": "KS", "620": "KS", "785": "KS", "913": "KS",
+    # Kentucky (KY)
+    "270": "KY", "364": "KY", "502": "KY", "606": "KY", "859": "KY",
+    # Louisiana (LA)
+    "225": "LA", "318": "LA", "337": "LA", "504": "LA", "985": "LA",
+    # Maine (ME)
+    "207": "ME",
+    # Maryland (MD)
+    "227": "MD", "240": "MD", "301": "MD", "410": "MD", "443": "MD", "667": "MD",
+    # Massachusetts (MA)
+    "339": "MA", "351": "MA", "413": "MA", "508": "MA", "617": "MA", "774": "MA", "781": "MA",
+    "857": "MA", "978": "MA",
+    # Michigan (MI)
+    "231": "MI", "248": "MI", "269": "MI", "313": "MI", "517": "MI", "586": "MI", "616": "MI",
+    "734": "MI", "810": "MI", "906": "MI", "947": "MI", "989": "MI",
+    # Minnesota (MN)
+    "218": "MN", "320": "MN", "507": "MN", "612": "MN", "651": "MN", "763": "MN", "952": "MN",
+    # Mississippi (MS)
+    "228": "MS", "601": "MS", "662": "MS", "769": "MS",
+    # Missouri (MO)
+    "235": "MO", "314": "MO", "417": "MO", "557": "MO", "573": "MO", "636": "MO", "660": "MO",
+    "816": "MO", "975": "MO",
+    # Montana (MT)
+    "406": "MT",
+    # Nebraska (NE)
+    "308": "NE", "402": "NE", "531": "NE",
+    # Nevada (NV)
+    "702": "NV", "725": "NV", "775": "NV",
+    # New Hampshire (NH)
+    "603": "NH",
+    # New Jersey (NJ)
+    "201": "NJ", "551": "NJ", "609": "NJ", "640": "NJ", "732": "NJ", "848": "NJ", "856": "NJ",
+    "862": "NJ", "908": "NJ", "973": "NJ",
+    # New Mexico (NM)
+    "505": "NM", "575": "NM",
+    # New York (NY)
+    "212": "NY", "315": "NY", "329": "NY", "332": "NY", "347": "NY", "363": "NY", "516": "NY",
+    "518": "NY", "585": "NY", "607": "NY", "631": "NY", "646": "NY", "680": "NY", "716": "NY",
+    "718": "NY", "838": "NY", "845": "NY", "914": "NY", "917": "NY", "929": "NY", "934": "NY",
+    # North Carolina (NC)
+    "252": "NC", "336": "NC", "472": "NC", "704": "NC", "743": "NC", "828": "NC", "910": "NC",
+    "919": "NC", "980": "NC", "984": "NC",
+    # North Dakota (ND)
+    "701": "ND",
+    # Ohio (OH)
+    "216": "OH", "220": "OH", "234": "OH", "283": "OH", "326": "OH", "330": "OH", "380": "OH",
+    "419": "OH", "440": "OH", "513": "OH", "567": "OH", "614": "OH", "740": "OH", "937": "OH",
+    # Oklahoma (OK)
+    "405": "OK", "539": "OK", "572": "OK", "580": "OK", "918": "OK",
+    # Oregon (OR)
+    "458": "OR", "503": "OR", "541": "OR", "971": "OR",
+    # Pennsylvania (PA)
+    "215": "PA", "223": "PA", "267": "PA", "272": "PA", "412": "PA", "445": "PA", "484": "PA",
+    "570": "PA", "582": "PA", "610": "PA", "717": "PA", "724": "PA", "814": "PA", "835": "PA",
+    "878": "PA",
+    # Puerto Rico (PR)
+    "787": "PR", "939": "PR",
+    # Rhode Island (RI)
+    "401": "RI",
+    # South Carolina (SC)
+    "803": "SC", "821": "SC", "839": "SC", "843": "SC", "854": "SC", "864": "SC",
+    # South Dakota (SD)
+    "605": "SD",
+    # Tennessee (TN)
+    "423": "TN", "615": "TN", "629": "TN", "731": "TN", "865": "TN", "901": "TN", "931": "TN",
+    # Texas (TX)
+    "210": "TX", "214": "TX", "254": "TX", "281": "TX", "325": "TX", "346": "TX", "361": "TX",
+    "409": "TX", "430": "TX", "432": "TX", "469": "TX", "512": "TX", "682": "TX", "713": "TX",
+    "726": "TX", "737": "TX", "806": "TX", "817": "TX", "830": "TX", "832": "TX", "903": "TX",
+    "915": "TX", "936": "TX", "940": "TX", "945": "TX", "956": "TX", "972": "TX", "979": "TX",
+    # U.S. Virgin Islands (VI)
+    "340": "VI",
+    # Utah (UT)
+    "385": "UT", "435": "UT", "801": "UT",
+    # Vermont (VT)
+    "802": "VT",
+    # Virginia (VA)
+    "276": "VA", "434": "VA", "540": "VA", "571": "VA", "686": "VA", "703": "VA", "757": "VA",
+    "804": "VA", "826": "VA", "948": "VA",
+    # Washington (WA)
+    "206": "WA", "253": "WA", "360": "WA", "425": "WA", "509": "WA", "564": "WA",
+    # West Virginia (WV)
+    "304": "WV", "681": "WV",
+    # Wisconsin (WI)
+    "262": "WI", "274": "WI", "353": "WI", "414": "WI", "534": "WI", "608": "WI", "715": "WI",
+    "920": "WI",
+    # Wyoming (WY)
+    "307": "WY",
+}
+
+# Map the state names produced by phonenumbers' geocoder (e.g. "California",
+# "Los Angeles, CA", "Washington D.C.") back to USPS abbreviations so the cold
+# fallback path returns the same representation as NPA_TO_STATE.
+STATE_NAME_TO_ABBR = {
+    "ALABAMA": "AL", "ALASKA": "AK", "ARIZONA": "AZ", "ARKANSAS": "AR", "CALIFORNIA": "CA",
+    "COLORADO": "CO", "CONNECTICUT": "CT", "DELAWARE": "DE", "DISTRICT OF COLUMBIA": "DC",
+    "WASHINGTON D.C.": "DC", "FLORIDA": "FL", "GEORGIA": "GA", "HAWAII": "HI", "IDAHO": "ID",
+    "ILLINOIS": "IL", "INDIANA": "IN", "IOWA": "IA", "KANSAS": "KS", "KENTUCKY": "KY",
+    "LOUISIANA": "LA", "MAINE": "ME", "MARYLAND": "MD", "MASSACHUSETTS": "MA", "MICHIGAN": "MI",
+    "MINNESOTA": "MN", "MISSISSIPPI": "MS", "MISSOURI": "MO", "MONTANA": "MT", "NEBRASKA": "NE",
+    "NEVADA": "NV", "NEW HAMPSHIRE": "NH", "NEW JERSEY": "NJ", "NEW MEXICO": "NM",
+    "NEW YORK": "NY", "NORTH CAROLINA": "NC", "NORTH DAKOTA": "ND", "OHIO": "OH",
+    "OKLAHOMA": "OK", "OREGON": "OR", "PENNSYLVANIA": "PA", "RHODE ISLAND": "RI",
+    "SOUTH CAROLINA": "SC", "SOUTH DAKOTA": "SD", "TENNESSEE": "TN", "TEXAS": "TX",
+    "UTAH": "UT", "VERMONT": "VT", "VIRGINIA": "VA", "WASHINGTON": "WA",
+    "WASHINGTON STATE": "WA", "WEST VIRGINIA": "WV", "WISCONSIN": "WI", "WYOMING": "WY",
+    "PUERTO RICO": "PR", "GUAM": "GU", "AMERICAN SAMOA": "AS",
+    "NORTHERN MARIANA ISLANDS": "MP", "U.S. VIRGIN ISLANDS": "VI", "VIRGIN ISLANDS": "VI",
+}
+
+_US_STATE_ABBRS = frozenset(STATE_NAME_TO_ABBR.values())
+
+_ONE_PARTY_STATES = frozenset(NPA_TO_STATE.values()) - TWO_PARTY_STATES
+
+# Collapse the consent decision into a single table: True = 1-party state,
+# keep recording; False = 2-party state, pause. Unknown states miss the dict
+# and come back as None, so the webhook pays one hash probe instead of two
+# membership checks.
+STATE_ACTION = {
+    **{s: False for s in TWO_PARTY_STATES},
+    **{s: True for s in _ONE_PARTY_STATES},
+}
+
+# 1000-slot array indexed by the integer NPA. List indexing with an int is the
+# cheapest lookup primitive CPython has (no string hashing), and the state
+# abbreviations are interned so downstream dict/set probes short-circuit on
+# pointer equality.
+NPA_STATE_ARRAY = [None] * 1000
+for _npa, _state in NPA_TO_STATE.items():
+    NPA_STATE_ARRAY[int(_npa)] = sys.intern(_state)
+del _npa, _state
+
+# Consent dispatch folded into a byte per NPA: 0 = unknown/non-US (needs the
+# slow path), 1 = 1-party state (keep recording), 2 = 2-party state (pause).
+# One bytearray index answers both "which state" questions the webhook asks.
+NPA_CONSENT = bytearray(1000)
+for _npa, _state in NPA_TO_STATE.items():
+    NPA_CONSENT[int(_npa)] = 2 if _state in TWO_PARTY_STATES else 1
+del _npa, _state